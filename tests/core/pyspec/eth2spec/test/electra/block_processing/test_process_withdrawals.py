@@ -15,6 +15,7 @@ from eth2spec.test.helpers.withdrawals import (
     run_withdrawals_processing,
     set_compounding_withdrawal_credential_with_balance,
     prepare_pending_withdrawal,
+    prepare_pending_withdrawals,
 )
 
 
@@ -39,13 +40,9 @@ def test_success_mixed_fully_and_partial_withdrawable_compounding(spec, state):
         partial_withdrawals_indices=partial_withdrawals_indices)
 
 
-@with_electra_and_later
-@spec_state_test
-def test_success_no_max_effective_balance_compounding(spec, state):
+def run_not_partially_withdrawable_compounding_test(spec, state, effective_balance, balance=None):
     validator_index = len(state.validators) // 2
-    # To be partially withdrawable, the validator's effective balance must be maxed out
-    effective_balance = spec.MAX_EFFECTIVE_BALANCE_ELECTRA - spec.EFFECTIVE_BALANCE_INCREMENT
-    set_compounding_withdrawal_credential_with_balance(spec, state, validator_index, effective_balance)
+    set_compounding_withdrawal_credential_with_balance(spec, state, validator_index, effective_balance, balance)
 
     validator = state.validators[validator_index]
     assert not spec.is_partially_withdrawable_validator(validator, state.balances[validator_index])
@@ -55,37 +52,29 @@ def test_success_no_max_effective_balance_compounding(spec, state):
     yield from run_withdrawals_processing(spec, state, execution_payload, num_expected_withdrawals=0)
 
 
+@with_electra_and_later
+@spec_state_test
+def test_success_no_max_effective_balance_compounding(spec, state):
+    # To be partially withdrawable, the validator's effective balance must be maxed out
+    effective_balance = spec.MAX_EFFECTIVE_BALANCE_ELECTRA - spec.EFFECTIVE_BALANCE_INCREMENT
+    yield from run_not_partially_withdrawable_compounding_test(spec, state, effective_balance)
+
+
 @with_electra_and_later
 @spec_state_test
 def test_success_no_excess_balance_compounding(spec, state):
-    validator_index = len(state.validators) // 2
     # To be partially withdrawable, the validator needs an excess balance
     effective_balance = spec.MAX_EFFECTIVE_BALANCE_ELECTRA
-    set_compounding_withdrawal_credential_with_balance(spec, state, validator_index, effective_balance)
-
-    validator = state.validators[validator_index]
-    assert not spec.is_partially_withdrawable_validator(validator, state.balances[validator_index])
-
-    execution_payload = build_empty_execution_payload(spec, state)
-
-    yield from run_withdrawals_processing(spec, state, execution_payload, num_expected_withdrawals=0)
+    yield from run_not_partially_withdrawable_compounding_test(spec, state, effective_balance)
 
 
 @with_electra_and_later
 @spec_state_test
 def test_success_excess_balance_but_no_max_effective_balance_compounding(spec, state):
-    validator_index = len(state.validators) // 2
     # To be partially withdrawable, the validator needs both a maxed out effective balance and an excess balance
     effective_balance = spec.MAX_EFFECTIVE_BALANCE_ELECTRA - spec.EFFECTIVE_BALANCE_INCREMENT
     balance = spec.MAX_EFFECTIVE_BALANCE_ELECTRA + spec.EFFECTIVE_BALANCE_INCREMENT
-    set_compounding_withdrawal_credential_with_balance(spec, state, validator_index, effective_balance, balance)
-
-    validator = state.validators[validator_index]
-    assert not spec.is_partially_withdrawable_validator(validator, state.balances[validator_index])
-
-    execution_payload = build_empty_execution_payload(spec, state)
-
-    yield from run_withdrawals_processing(spec, state, execution_payload, num_expected_withdrawals=0)
+    yield from run_not_partially_withdrawable_compounding_test(spec, state, effective_balance, balance)
 
 
 @with_electra_and_later
@@ -109,7 +98,7 @@ def test_pending_withdrawals_one_skipped_one_effective(spec, state):
         pending_withdrawal_requests=[pending_withdrawal_1]
     )
 
-    assert state.pending_partial_withdrawals == []
+    assert len(state.pending_partial_withdrawals) == 0
 
 
 @with_electra_and_later
@@ -129,13 +118,13 @@ def test_pending_withdrawals_next_epoch(spec, state):
 @with_electra_and_later
 @spec_state_test
 def test_pending_withdrawals_at_max(spec, state):
-    pending_withdrawal_requests = []
     # Create spec.MAX_PENDING_PARTIALS_PER_WITHDRAWALS_SWEEP + 1 partial withdrawals
-    for i in range(0, spec.MAX_PENDING_PARTIALS_PER_WITHDRAWALS_SWEEP + 1):
-        pending_withdrawal = prepare_pending_withdrawal(spec, state, i)
-        pending_withdrawal_requests.append(pending_withdrawal)
+    num_pending_withdrawal_requests = spec.MAX_PENDING_PARTIALS_PER_WITHDRAWALS_SWEEP + 1
+    pending_withdrawal_requests = prepare_pending_withdrawals(
+        spec, state, range(0, num_pending_withdrawal_requests)
+    )
 
-    assert len(state.pending_partial_withdrawals) == spec.MAX_PENDING_PARTIALS_PER_WITHDRAWALS_SWEEP + 1
+    assert len(state.pending_partial_withdrawals) == num_pending_withdrawal_requests
 
     execution_payload = build_empty_execution_payload(spec, state)
     yield from run_withdrawals_processing(
@@ -160,7 +149,7 @@ def test_pending_withdrawals_exiting_validator(spec, state):
     execution_payload = build_empty_execution_payload(spec, state)
     yield from run_withdrawals_processing(spec, state, execution_payload, num_expected_withdrawals=0)
 
-    assert state.pending_partial_withdrawals == []
+    assert len(state.pending_partial_withdrawals) == 0
 
 
 @with_electra_and_later
@@ -176,7 +165,7 @@ def test_pending_withdrawals_low_effective_balance(spec, state):
     execution_payload = build_empty_execution_payload(spec, state)
     yield from run_withdrawals_processing(spec, state, execution_payload, num_expected_withdrawals=0)
 
-    assert state.pending_partial_withdrawals == []
+    assert len(state.pending_partial_withdrawals) == 0
 
 
 @with_electra_and_later
@@ -190,7 +179,7 @@ def test_pending_withdrawals_no_excess_balance(spec, state):
     execution_payload = build_empty_execution_payload(spec, state)
     yield from run_withdrawals_processing(spec, state, execution_payload, num_expected_withdrawals=0)
 
-    assert state.pending_partial_withdrawals == []
+    assert len(state.pending_partial_withdrawals) == 0
 
 
 @with_electra_and_later
@@ -205,14 +194,15 @@ def test_pending_withdrawals_with_ineffective_sweep_on_top(spec, state):
         effective_balance=spec.MAX_EFFECTIVE_BALANCE_ELECTRA,
     )
 
+    validator = state.validators[validator_index]
     # Check that validator is partially withdrawable before pending withdrawal is processed
     assert spec.is_partially_withdrawable_validator(
-        state.validators[validator_index],
+        validator,
         state.balances[validator_index]
     )
     # And is not partially withdrawable thereafter
     assert not spec.is_partially_withdrawable_validator(
-        state.validators[validator_index],
+        validator,
         state.balances[validator_index] - pending_withdrawal.amount
     )
 
@@ -227,7 +217,7 @@ def test_pending_withdrawals_with_ineffective_sweep_on_top(spec, state):
         pending_withdrawal_requests=[pending_withdrawal]
     )
 
-    assert state.pending_partial_withdrawals == []
+    assert len(state.pending_partial_withdrawals) == 0
 
 
 @with_electra_and_later
@@ -253,12 +243,13 @@ def test_pending_withdrawals_with_ineffective_sweep_on_top_2(spec, state):
     # Set excess balance in a way that validator
     # becomes not partially withdrawable only after the second pending withdrawal is processed
     state.balances[validator_index] = spec.MAX_EFFECTIVE_BALANCE_ELECTRA + spec.EFFECTIVE_BALANCE_INCREMENT
+    validator = state.validators[validator_index]
     assert spec.is_partially_withdrawable_validator(
-        state.validators[validator_index],
+        validator,
         state.balances[validator_index] - pending_withdrawal_0.amount
     )
     assert not spec.is_partially_withdrawable_validator(
-        state.validators[validator_index],
+        validator,
         state.balances[validator_index] - pending_withdrawal_0.amount - pending_withdrawal_1.amount
     )
 
@@ -273,7 +264,7 @@ def test_pending_withdrawals_with_ineffective_sweep_on_top_2(spec, state):
         pending_withdrawal_requests=[pending_withdrawal_0, pending_withdrawal_1]
     )
 
-    assert state.pending_partial_withdrawals == []
+    assert len(state.pending_partial_withdrawals) == 0
 
 
 @with_electra_and_later
@@ -315,15 +306,15 @@ def test_pending_withdrawals_with_effective_sweep_on_top(spec, state):
         pending_withdrawal_requests=[pending_withdrawal_0, pending_withdrawal_1]
     )
 
-    assert state.pending_partial_withdrawals == []
+    assert len(state.pending_partial_withdrawals) == 0
 
 
 @with_electra_and_later
 @spec_state_test
 def test_pending_withdrawals_with_sweep_different_validator(spec, state):
     # Ensure validator will be processed by the sweep
-    validator_index_0 = min(len(state.validators), spec.MAX_VALIDATORS_PER_WITHDRAWALS_SWEEP) // 2 - 1
     validator_index_1 = min(len(state.validators), spec.MAX_VALIDATORS_PER_WITHDRAWALS_SWEEP) // 2
+    validator_index_0 = validator_index_1 - 1
 
     # Initiate pending withdrawal for the first validator
     pending_withdrawal_0 = prepare_pending_withdrawal(
@@ -356,17 +347,14 @@ def test_pending_withdrawals_with_sweep_different_validator(spec, state):
         pending_withdrawal_requests=[pending_withdrawal_0]
     )
 
-    assert state.pending_partial_withdrawals == []
+    assert len(state.pending_partial_withdrawals) == 0
 
 
-@with_electra_and_later
-@spec_state_test
-def test_pending_withdrawals_mixed_with_sweep_and_fully_withdrawable(spec, state):
+def prepare_pending_withdrawals_mixed_with_sweep(spec, state, num_pending_withdrawal_requests):
     num_full_withdrawals = spec.MAX_WITHDRAWALS_PER_PAYLOAD // 4
     num_partial_withdrawals = spec.MAX_WITHDRAWALS_PER_PAYLOAD // 4
     num_full_withdrawals_comp = spec.MAX_WITHDRAWALS_PER_PAYLOAD // 4
     num_partial_withdrawals_comp = spec.MAX_WITHDRAWALS_PER_PAYLOAD // 4
-    num_pending_withdrawal_requests = spec.MAX_PENDING_PARTIALS_PER_WITHDRAWALS_SWEEP // 2
 
     fully_withdrawable_indices, partial_withdrawals_indices = prepare_expected_withdrawals(
         spec, state,
@@ -377,15 +365,25 @@ def test_pending_withdrawals_mixed_with_sweep_and_fully_withdrawable(spec, state
         num_partial_withdrawals_comp=num_partial_withdrawals_comp,
     )
 
-    pending_withdrawal_requests = []
-    for index in range(0, len(state.validators)):
-        if len(pending_withdrawal_requests) >= num_pending_withdrawal_requests:
-            break
-        if index in (fully_withdrawable_indices + partial_withdrawals_indices):
-            continue
+    excluded_indices = set(fully_withdrawable_indices + partial_withdrawals_indices)
+    # At most `len(excluded_indices)` indices are skipped, so this bound is enough to collect all requests
+    bound = min(len(state.validators), num_pending_withdrawal_requests + len(excluded_indices))
+
+    pending_withdrawal_indices = [
+        index for index in range(0, bound) if index not in excluded_indices
+    ][:num_pending_withdrawal_requests]
+    pending_withdrawal_requests = prepare_pending_withdrawals(spec, state, pending_withdrawal_indices)
+
+    return fully_withdrawable_indices, partial_withdrawals_indices, pending_withdrawal_requests
 
-        pending_withdrawal = prepare_pending_withdrawal(spec, state, index)
-        pending_withdrawal_requests.append(pending_withdrawal)
+
+@with_electra_and_later
+@spec_state_test
+def test_pending_withdrawals_mixed_with_sweep_and_fully_withdrawable(spec, state):
+    num_pending_withdrawal_requests = spec.MAX_PENDING_PARTIALS_PER_WITHDRAWALS_SWEEP // 2
+    fully_withdrawable_indices, partial_withdrawals_indices, pending_withdrawal_requests = (
+        prepare_pending_withdrawals_mixed_with_sweep(spec, state, num_pending_withdrawal_requests)
+    )
 
     next_slot(spec, state)
     execution_payload = build_empty_execution_payload(spec, state)
@@ -398,37 +396,17 @@ def test_pending_withdrawals_mixed_with_sweep_and_fully_withdrawable(spec, state
         pending_withdrawal_requests=pending_withdrawal_requests
     )
 
-    assert state.pending_partial_withdrawals == []
+    assert len(state.pending_partial_withdrawals) == 0
 
 
 @with_electra_and_later
 @spec_state_test
 def test_pending_withdrawals_at_max_mixed_with_sweep_and_fully_withdrawable(spec, state):
-    num_full_withdrawals = spec.MAX_WITHDRAWALS_PER_PAYLOAD // 4
-    num_partial_withdrawals = spec.MAX_WITHDRAWALS_PER_PAYLOAD // 4
-    num_full_withdrawals_comp = spec.MAX_WITHDRAWALS_PER_PAYLOAD // 4
-    num_partial_withdrawals_comp = spec.MAX_WITHDRAWALS_PER_PAYLOAD // 4
     num_pending_withdrawal_requests = spec.MAX_PENDING_PARTIALS_PER_WITHDRAWALS_SWEEP + 1
-
-    fully_withdrawable_indices, partial_withdrawals_indices = prepare_expected_withdrawals(
-        spec, state,
-        rng=random.Random(42),
-        num_full_withdrawals=num_full_withdrawals,
-        num_partial_withdrawals=num_partial_withdrawals,
-        num_full_withdrawals_comp=num_full_withdrawals_comp,
-        num_partial_withdrawals_comp=num_partial_withdrawals_comp,
+    fully_withdrawable_indices, partial_withdrawals_indices, pending_withdrawal_requests = (
+        prepare_pending_withdrawals_mixed_with_sweep(spec, state, num_pending_withdrawal_requests)
     )
 
-    pending_withdrawal_requests = []
-    for index in range(0, len(state.validators)):
-        if len(pending_withdrawal_requests) >= num_pending_withdrawal_requests:
-            break
-        if index in (fully_withdrawable_indices + partial_withdrawals_indices):
-            continue
-
-        pending_withdrawal = prepare_pending_withdrawal(spec, state, index)
-        pending_withdrawal_requests.append(pending_withdrawal)
-
     next_slot(spec, state)
     execution_payload = build_empty_execution_payload(spec, state)
     yield from run_withdrawals_processing(
@@ -13,7 +13,7 @@ def set_validator_fully_withdrawable(spec, state, index, withdrawable_epoch=None
     if withdrawable_epoch is None:
         withdrawable_epoch = spec.get_current_epoch(state)
 
-    validator = state.validators[index]
+    validator = state.validators[index].copy()
     validator.withdrawable_epoch = withdrawable_epoch
     # set exit epoch as well to avoid interactions with other epoch process, e.g. forced ejections
     if validator.exit_epoch > withdrawable_epoch:
@@ -21,11 +21,12 @@ def set_validator_fully_withdrawable(spec, state, index, withdrawable_epoch=None
 
     if validator.withdrawal_credentials[0:1] == spec.BLS_WITHDRAWAL_PREFIX:
         validator.withdrawal_credentials = spec.ETH1_ADDRESS_WITHDRAWAL_PREFIX + validator.withdrawal_credentials[1:]
+    state.validators[index] = validator
 
     if state.balances[index] == 0:
         state.balances[index] = 10000000000
 
-    assert spec.is_fully_withdrawable_validator(validator, state.balances[index], withdrawable_epoch)
+    assert spec.is_fully_withdrawable_validator(state.validators[index], state.balances[index], withdrawable_epoch)
 
 
 def set_eth1_withdrawal_credential_with_balance(spec, state, index, balance=None, address=None):
@@ -34,9 +35,11 @@ def set_eth1_withdrawal_credential_with_balance(spec, state, index, balance=None
     if address is None:
         address = b'\x11' * 20
 
-    validator = state.validators[index]
+    # Edit a detached copy and write it back, so the validators tree is updated once instead of per field
+    validator = state.validators[index].copy()
     validator.withdrawal_credentials = spec.ETH1_ADDRESS_WITHDRAWAL_PREFIX + b'\x00' * 11 + address
     validator.effective_balance = min(balance, spec.MAX_EFFECTIVE_BALANCE)
+    state.validators[index] = validator
     state.balances[index] = balance
 
 
@@ -86,27 +89,44 @@ def prepare_expected_withdrawals(spec, state, rng,
     return fully_withdrawable_indices, partial_withdrawals_indices
 
 
-def set_compounding_withdrawal_credential(spec, state, index, address=None):
+def get_compounding_withdrawal_credential(spec, address=None):
     if address is None:
         address = b'\x11' * 20
 
+    return spec.COMPOUNDING_WITHDRAWAL_PREFIX + b'\x00' * 11 + address
+
+
+def set_compounding_withdrawal_credential(spec, state, index, address=None):
     validator = state.validators[index]
-    validator.withdrawal_credentials = spec.COMPOUNDING_WITHDRAWAL_PREFIX + b'\x00' * 11 + address
+    validator.withdrawal_credentials = get_compounding_withdrawal_credential(spec, address)
 
 
 def set_compounding_withdrawal_credential_with_balance(spec, state, index,
                                                        effective_balance=None, balance=None, address=None):
-    set_compounding_withdrawal_credential(spec, state, index, address)
-
     if effective_balance is None:
         effective_balance = spec.MAX_EFFECTIVE_BALANCE_ELECTRA
     if balance is None:
         balance = effective_balance
 
-    state.validators[index].effective_balance = effective_balance
+    validator = state.validators[index].copy()
+    validator.withdrawal_credentials = get_compounding_withdrawal_credential(spec, address)
+    validator.effective_balance = effective_balance
+    state.validators[index] = validator
     state.balances[index] = balance
 
 
+def _build_pending_withdrawal(spec, state, validator_index, effective_balance, balance, amount, withdrawable_epoch):
+    set_compounding_withdrawal_credential_with_balance(
+        spec, state, validator_index, effective_balance, balance
+    )
+
+    return spec.PendingPartialWithdrawal(
+        validator_index=validator_index,
+        amount=amount,
+        withdrawable_epoch=withdrawable_epoch,
+    )
+
+
 def prepare_pending_withdrawal(spec, state, validator_index,
                                effective_balance=32_000_000_000, amount=1_000_000_000, withdrawable_epoch=None):
     assert is_post_electra(spec)
@@ -115,20 +135,32 @@ def prepare_pending_withdrawal(spec, state, validator_index,
         withdrawable_epoch = spec.get_current_epoch(state)
 
     balance = effective_balance + amount
-    set_compounding_withdrawal_credential_with_balance(
-        spec, state, validator_index, effective_balance, balance
-    )
-
-    withdrawal = spec.PendingPartialWithdrawal(
-        validator_index=validator_index,
-        amount=amount,
-        withdrawable_epoch=withdrawable_epoch,
+    withdrawal = _build_pending_withdrawal(
+        spec, state, validator_index, effective_balance, balance, amount, withdrawable_epoch
     )
     state.pending_partial_withdrawals.append(withdrawal)
 
     return withdrawal
 
 
+def prepare_pending_withdrawals(spec, state, validator_indices,
+                                effective_balance=32_000_000_000, amount=1_000_000_000, withdrawable_epoch=None):
+    assert is_post_electra(spec)
+
+    if withdrawable_epoch is None:
+        withdrawable_epoch = spec.get_current_epoch(state)
+
+    balance = effective_balance + amount
+    withdrawals = [
+        _build_pending_withdrawal(spec, state, validator_index, effective_balance, balance, amount, withdrawable_epoch)
+        for validator_index in validator_indices
+    ]
+    # Rebuild the list once instead of appending per entry
+    state.pending_partial_withdrawals = list(state.pending_partial_withdrawals) + withdrawals
+
+    return withdrawals
+
+
 def prepare_withdrawal_request(spec, state, validator_index, address=None, amount=None):
     validator = state.validators[validator_index]
     if not spec.has_execution_withdrawal_credential(validator):